@@ -0,0 +1,235 @@
+"""Markdown renderer that outputs Logseq outlines.
+
+Kept apart from the package ``__init__`` and fully annotated, so the rendering hot path can be compiled with mypyc.
+``LogseqRenderer`` stays open to subclassing from interpreted code, even when compiled.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import cast
+
+from mistletoe import block_token, span_token, token
+from mistletoe.base_renderer import BaseRenderer
+from mypy_extensions import mypyc_attr
+
+from logseq_doctor.constants import CHAR_DASH
+
+# The renderer always emits "\n"; it is converted to the platform line separator once, in markdown_to_outline()
+_NL = "\n"
+_LS = os.linesep
+_BULLET = "- "
+_THEMATIC_BREAK = CHAR_DASH * 3 + _NL
+# Setext heading text followed by its dashed underline; front matter, for example, is parsed as one of these
+_SETEXT_HEADING_FMT = "%s" + _NL + _THEMATIC_BREAK
+# Spans rendered as their text only, and their render methods; BaseRenderer's methods for them only call render_inner()
+_TEXT_ONLY_SPANS = {
+    "AutoLink": "render_auto_link",
+    "Emphasis": "render_emphasis",
+    "EscapeSequence": "render_escape_sequence",
+    "Image": "render_image",
+    "InlineCode": "render_inline_code",
+    "Strikethrough": "render_strikethrough",
+    "Strong": "render_strong",
+}
+# Deeper outlines are rare; the ladder grows on demand past this depth
+_BULLET_PREFIXES: list[str] = ["  " * indent + _BULLET for indent in range(64)]
+
+
+def _bullet_prefix(indent: int) -> str:
+    """Leading spaces and bullet for an indent level, cached because ``outline()`` is called once per output line."""
+    # A heading nested in a list item can leave the level below zero; render it unindented, like "  " * -1 did
+    indent = max(indent, 0)
+    if indent >= len(_BULLET_PREFIXES):
+        _BULLET_PREFIXES.extend("  " * deeper + _BULLET for deeper in range(len(_BULLET_PREFIXES), indent + 1))
+    return _BULLET_PREFIXES[indent]
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class LogseqRenderer(BaseRenderer):
+    """Render Markdown as an outline with bullets, like Logseq expects.
+
+    Block tokens append their lines to a buffer shared by the whole document and return an empty string;
+    the buffer is joined once, in ``render_document()``. Span tokens return their text as usual,
+    because paragraphs and headings need it as a string.
+    """
+
+    current_level: int
+    _buf: list[str]
+    _raw_text_fast_path: bool
+    _flat_tables: bool
+
+    def __init__(self, *extras: token.Token) -> None:
+        super().__init__(*extras)
+        # Dispatch straight to render_inner(), saving a Python frame per span, unless a subclass overrides the method
+        for name, method in _TEXT_ONLY_SPANS.items():
+            if getattr(type(self), method) is getattr(BaseRenderer, method):
+                self.render_map[name] = self.render_inner
+        # Same for raw text: render_inner() can return its content directly, unless render_raw_text() is overridden
+        self._raw_text_fast_path = type(self).render_raw_text is BaseRenderer.render_raw_text
+        # Tables skip the row and cell renderers, unless a subclass overrides one of them
+        self._flat_tables = all(
+            getattr(type(self), method) is getattr(BaseRenderer, method)
+            for method in ("render_table_row", "render_table_cell")
+        )
+        self.current_level = 0
+        self._buf = []
+
+    def outline(self, indent: int, text: str, *, nl: bool = True) -> str:
+        """Render a line of text with the correct indentation."""
+        return _bullet_prefix(indent) + text + (_NL if nl else "")
+
+    def render_inner(self, token: token.Token) -> str:
+        """Render the children of a token.
+
+        A lone raw text child, as in most headings, links and emphasis, is returned as is, skipping the generic loop,
+        unless a subclass overrides ``render_raw_text()``.
+        """
+        children = token.children
+        if (
+            self._raw_text_fast_path
+            and isinstance(children, (list, tuple))
+            and len(children) == 1
+            and type(children[0]) is span_token.RawText
+        ):
+            return children[0].content
+        return super().render_inner(token)
+
+    def _render_blocks(self, token: token.Token) -> None:
+        """Render the children of a block token into the output buffer, keeping strings returned by leaf blocks."""
+        append = self._buf.append
+        render = self.render
+        for child in token.children or ():
+            rendered = render(child)
+            if rendered:
+                append(rendered)
+
+    def render_document(self, token: block_token.Document) -> str:
+        """Render the whole document into a fresh output buffer and join it once.
+
+        The per-document state is reset, so the same renderer can be reused for many documents.
+        """
+        self.current_level = 0
+        self._buf = []
+        self._render_blocks(token)
+        return "".join(self._buf)
+
+    def render_heading(self, token: block_token.Heading | block_token.SetextHeading) -> str:
+        """Setext headings: https://spec.commonmark.org/0.30/#setext-headings."""
+        if isinstance(token, block_token.SetextHeading):
+            # For now, only dealing with level 2 setext headers (dashes)
+            self._buf.append(_SETEXT_HEADING_FMT % self.render_inner(token))
+            return ""
+
+        self.current_level = token.level
+        hashes = "#" * token.level
+        inner = self.render_inner(token)
+        self._buf.append(self.outline(token.level - 1, f"{hashes} {inner}"))
+        return ""
+
+    def render_line_break(self, token: span_token.LineBreak) -> str:
+        """Render a line break."""
+        return token.content + _NL
+
+    def render_paragraph(self, token: block_token.Paragraph) -> str:
+        """Render a paragraph with the correct indentation."""
+        nl = _NL
+        lines = self.render_inner(token).strip().splitlines()
+        if not lines:
+            self._buf.append(nl)
+            return ""
+        # Interleave the prefix with str.join so the per-line loop runs in C, not in Python
+        prefix = _bullet_prefix(self.current_level)
+        self._buf.append(prefix + (nl + prefix).join(lines) + nl)
+        return ""
+
+    def render_quote(self, token: block_token.Quote) -> str:
+        """Render the blocks of a quote as regular outline blocks."""
+        self._render_blocks(token)
+        return ""
+
+    def render_list(self, token: block_token.List) -> str:
+        """Render the items of a list."""
+        self._render_blocks(token)
+        return ""
+
+    def render_link(self, token: span_token.Link) -> str:
+        """Render a link as a Markdown link."""
+        text = self.render_inner(token)
+        url = token.target
+        return f"[{text}]({url})"
+
+    def render_list_item(self, token: block_token.ListItem) -> str:
+        """Render a list item with the correct indentation."""
+        # mistletoe types children as an optional iterable, but list items always have a list of children
+        if len(cast("list[block_token.BlockToken]", token.children)) <= 1:
+            self._render_blocks(token)
+            return ""
+
+        buf = self._buf
+        start = len(buf)
+        self.current_level += 1
+        self._render_blocks(token)
+        self.current_level -= 1
+
+        # The first child was rendered one level deeper: move it up to this item's level.
+        # Only that fragment is rewritten, instead of re-copying the text of the whole subtree.
+        child_prefix = _bullet_prefix(self.current_level + 1)
+        if start < len(buf) and buf[start].startswith(child_prefix):
+            buf[start] = _bullet_prefix(self.current_level) + buf[start][len(child_prefix) :]
+            return ""
+
+        inner = "".join(buf[start:])
+        del buf[start:]
+        # Remove the indentation and exactly one bullet; lstrip(_BULLET) would also eat dashes from the text itself
+        headless_parent_with_children = inner.lstrip(" ").removeprefix(_BULLET)
+        buf.append(self.outline(self.current_level, headless_parent_with_children, nl=False))
+        return ""
+
+    def render_block_code(self, token: block_token.BlockCode) -> str:
+        """Render fenced and indented code as its raw content, handing back the parsed string without copying it."""
+        return token.content
+
+    def render_table(self, token: block_token.Table) -> str:
+        """Render every cell of the table body with one join, instead of a join per table, row and cell."""
+        if not self._flat_tables:
+            return super().render_table(token)
+        render_inner = self.render_inner
+        return "".join([render_inner(cell) for row in token.children or () for cell in row.children or ()])
+
+    def render_thematic_break(self, token: block_token.ThematicBreak) -> str:  # noqa: ARG002
+        """Render a horizontal rule as a line of dashes."""
+        return _THEMATIC_BREAK
+
+    # TODO: refactor: the methods below are placeholders taken from BaseRenderer.render_map.
+    #  - Uncomment them to use them during debugging; defining them also turns off the matching fast paths above.
+    #  - Remove them when there will be enough test coverage for all the different elements below
+    # def render_raw_text(self, token):
+    #     return token.content
+    #
+    # def render_table_row(self, token):
+    #     return self.render_inner(token)
+    #
+    # def render_table_cell(self, token):
+    #     return self.render_inner(token)
+
+
+_thread_local = threading.local()
+
+
+def _renderer() -> LogseqRenderer:
+    """Renderer of the current thread, created on first use; it holds per-document state, so threads can't share it."""
+    renderer = getattr(_thread_local, "renderer", None)
+    if renderer is None:
+        renderer = _thread_local.renderer = LogseqRenderer()
+    return renderer
+
+
+def markdown_to_outline(markdown_contents: str) -> str:
+    """Convert flat Markdown to an outline, with the renderer of the current thread."""
+    if _LS == _NL:
+        return _renderer().render(block_token.Document(markdown_contents))
+    # Normalize the input too, or raw code block content with platform line endings would end up with "\r\r\n"
+    outline = _renderer().render(block_token.Document(markdown_contents.replace(_LS, _NL)))
+    return outline.replace(_NL, _LS)
@@ -3,9 +3,12 @@ from pathlib import Path
 from textwrap import dedent
 
 import mistletoe
-from logseq_doctor import flat_markdown_to_outline
+import pytest
+from logseq_doctor import flat_markdown_to_outline, flat_markdown_to_outline_many, renderer
 from logseq_doctor.cli import app
 from logseq_doctor.constants import CHAR_NBSP
+from logseq_doctor.renderer import markdown_to_outline
+from mistletoe import Document, block_token, span_token
 from mistletoe.ast_renderer import ASTRenderer
 from typer.testing import CliRunner
 
@@ -156,6 +159,50 @@ def test_nested_lists_multiple_levels() -> None:
     )
 
 
+def test_nested_list_keeps_leading_dashes_of_the_parent_text() -> None:
+    assert_markdown(
+        """
+        # Header
+
+        - -5 degrees
+          - Child
+        - --flag
+          - Child
+        """,
+        """
+        - # Header
+          - -5 degrees
+            - Child
+          - --flag
+            - Child
+        """,
+    )
+
+
+def test_heading_nested_in_a_list_item() -> None:
+    assert_markdown(
+        """
+        * x
+          * y
+
+            # h
+        * z
+        """,
+        """
+        - x
+        - y
+        - # h
+        - z
+        """,
+    )
+
+
+def test_heading_nested_in_a_list_item_after_a_deep_outline() -> None:
+    deep_md = "".join(f"{'  ' * level}- Level {level}\n" for level in range(70))
+    assert flat_markdown_to_outline(deep_md).splitlines()[-1] == f"{'  ' * 69}- Level 69"
+    assert flat_markdown_to_outline("* a\n  * b\n\n    # h\n* c\n") == "- a\n- b\n- # h\n- c\n"
+
+
 def test_thematic_break_setext_heading() -> None:
     assert_markdown(
         """
@@ -179,3 +226,59 @@ def test_thematic_break_setext_heading() -> None:
           - Line2
         """,
     )
+
+
+def test_same_contents_are_converted_once() -> None:
+    flat_markdown_to_outline.cache_clear()
+    flat_md = "# Cached header\n\nSome paragraph.\n"
+    first = flat_markdown_to_outline(flat_md)
+    assert flat_markdown_to_outline(flat_md) == first
+    cache_info = flat_markdown_to_outline.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 1
+
+
+def test_state_is_reset_between_documents() -> None:
+    assert flat_markdown_to_outline("# Header\n\nUnder the header.\n") == "- # Header\n  - Under the header.\n"
+    assert flat_markdown_to_outline("Without a header.\n") == "- Without a header.\n"
+
+
+def test_many_contents_are_converted_in_order() -> None:
+    many_flat_md = [f"# Header {number}\n\nParagraph {number}.\n" for number in range(5)]
+    expected = [flat_markdown_to_outline(flat_md) for flat_md in many_flat_md]
+    assert flat_markdown_to_outline_many(many_flat_md, workers=2) == expected
+    assert flat_markdown_to_outline_many(many_flat_md[:1]) == expected[:1]
+
+
+def test_platform_line_endings_in_code_blocks_are_not_doubled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(renderer, "_LS", "\r\n")
+    assert markdown_to_outline("```\r\na\r\n```\r\n\r\ntext\r\n") == "a\r\n- text\r\n"
+
+
+def test_subclass_can_override_span_renderers() -> None:
+    class StrongRenderer(renderer.LogseqRenderer):
+        def render_strong(self, token: span_token.Strong) -> str:
+            return f"**{self.render_inner(token)}**"
+
+    assert StrongRenderer().render(Document("Some **bold** text\n")) == "- Some **bold** text\n"
+    assert renderer.LogseqRenderer().render(Document("Some **bold** text\n")) == "- Some bold text\n"
+
+
+def test_subclass_can_override_raw_text_renderer() -> None:
+    class UpperCaseRenderer(renderer.LogseqRenderer):
+        def render_raw_text(self, token: span_token.RawText) -> str:
+            return token.content.upper()
+
+    assert UpperCaseRenderer().render(Document("hello\n")) == "- HELLO\n"
+    assert UpperCaseRenderer().render(Document("hello *x* there\n")) == "- HELLO X THERE\n"
+    assert renderer.LogseqRenderer().render(Document("hello *x* there\n")) == "- hello x there\n"
+
+
+def test_subclass_can_override_table_cell_renderer() -> None:
+    class CellRenderer(renderer.LogseqRenderer):
+        def render_table_cell(self, token: block_token.TableCell) -> str:
+            return f"[{self.render_inner(token)}]"
+
+    table_md = "| a | b |\n|---|---|\n| 1 | 2 |\n"
+    assert CellRenderer().render(Document(table_md)) == "[1][2]"
+    assert renderer.LogseqRenderer().render(Document(table_md)) == "12"